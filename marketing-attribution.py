@@ -7,6 +7,132 @@ from scipy.stats import beta
 import warnings
 warnings.filterwarnings('ignore')
 
+def _import_pyarrow(submodule=None):
+    """Import pyarrow (optional dependency, only needed for Arrow/Parquet output)"""
+    try:
+        import pyarrow
+        if submodule == 'parquet':
+            import pyarrow.parquet
+            return pyarrow.parquet
+        return pyarrow
+    except ImportError as exc:
+        raise ImportError("Arrow/Parquet ledger output requires pyarrow (pip install pyarrow)") from exc
+
+
+class CreditLedger:
+    def __init__(self, conversion_id, touch_index, channel, weight, value, channels, touch_row=None,
+                 conversion_labels=None, conversion_row=None):
+        """
+        Per-conversion, per-touch attribution credit held as typed columnar arrays
+
+        Parameters:
+        conversion_id: int64 conversion identifier (integer conversion_id, code into `conversion_labels`, or row position)
+        touch_index: int32 position of the touch within the conversion's journey
+        channel: integer code into `channels`
+        weight: float64 share of the conversion credited to the touch
+        value: float64 credited value (weight * conversion_value)
+        channels: array of channel names, sorted
+        touch_row: Optional int64 row position of the touch in the touchpoints table, for joining touch attributes
+        conversion_labels: Optional array of original conversion ids when they are not integers (e.g. order numbers)
+        conversion_row: Optional int64 row position of the conversion in the conversions table
+        """
+        code_dtype = np.int16 if len(channels) <= np.iinfo(np.int16).max else np.int32
+        self.conversion_id = np.asarray(conversion_id, dtype=np.int64)
+        self.touch_index = np.asarray(touch_index, dtype=np.int32)
+        self.channel = np.asarray(channel, dtype=code_dtype)
+        self.weight = np.asarray(weight, dtype=np.float64)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.channels = channels
+        self.touch_row = None if touch_row is None else np.asarray(touch_row, dtype=np.int64)
+        self.conversion_labels = conversion_labels
+        self.conversion_row = None if conversion_row is None else np.asarray(conversion_row, dtype=np.int64)
+
+    @classmethod
+    def concat(cls, ledgers, channels, conversion_labels=None):
+        touch_rows = None
+        if ledgers and all(ledger.touch_row is not None for ledger in ledgers):
+            touch_rows = np.concatenate([ledger.touch_row for ledger in ledgers])
+        conversion_rows = None
+        if ledgers and all(ledger.conversion_row is not None for ledger in ledgers):
+            conversion_rows = np.concatenate([ledger.conversion_row for ledger in ledgers])
+        return cls(
+            np.concatenate([ledger.conversion_id for ledger in ledgers] + [np.empty(0, dtype=np.int64)]),
+            np.concatenate([ledger.touch_index for ledger in ledgers] + [np.empty(0, dtype=np.int32)]),
+            np.concatenate([ledger.channel for ledger in ledgers] + [np.empty(0, dtype=np.int16)]),
+            np.concatenate([ledger.weight for ledger in ledgers] + [np.empty(0)]),
+            np.concatenate([ledger.value for ledger in ledgers] + [np.empty(0)]),
+            channels,
+            touch_rows,
+            conversion_labels,
+            conversion_rows
+        )
+
+    def __len__(self):
+        return len(self.conversion_id)
+
+    def channel_totals(self):
+        """Per-channel credited value, identical to the *_attribution output"""
+        return summarize_ledger([self], self.channels)
+
+    def to_frame(self):
+        """DataFrame view with the channel column as a Categorical and conversion ids decoded to their labels"""
+        frame = pd.DataFrame({
+            'conversion_id': self.conversion_id if self.conversion_labels is None else self.conversion_labels[self.conversion_id],
+            'touch_index': self.touch_index,
+            'channel': pd.Categorical.from_codes(self.channel, categories=self.channels),
+            'weight': self.weight,
+            'value': self.value
+        })
+        if self.touch_row is not None:
+            frame['touch_row'] = self.touch_row
+        if self.conversion_row is not None:
+            frame['conversion_row'] = self.conversion_row
+        return frame
+
+    def to_arrow(self):
+        """
+        pyarrow Table with the channel column (and non-integer conversion ids) dictionary-encoded
+
+        The conversion id dictionary only holds the labels used in this ledger, so streamed
+        chunks do not each carry the label of every conversion.
+        """
+        pa = _import_pyarrow()
+        conversion_id = self.conversion_id
+        if self.conversion_labels is not None:
+            used, codes = np.unique(self.conversion_id, return_inverse=True)
+            conversion_id = pa.DictionaryArray.from_arrays(
+                codes.astype(np.int32), pa.array(self.conversion_labels[used], from_pandas=True)
+            )
+        columns = {
+            'conversion_id': conversion_id,
+            'touch_index': self.touch_index,
+            'channel': pa.DictionaryArray.from_arrays(self.channel, pa.array(self.channels, type=pa.string())),
+            'weight': self.weight,
+            'value': self.value
+        }
+        if self.touch_row is not None:
+            columns['touch_row'] = self.touch_row
+        if self.conversion_row is not None:
+            columns['conversion_row'] = self.conversion_row
+        return pa.table(columns)
+
+
+def summarize_ledger(ledgers, channels):
+    """Aggregate credit ledger chunks into per-channel totals (channels with no credited touch are omitted)"""
+    totals = np.zeros(len(channels))
+    touches = np.zeros(len(channels), dtype=np.int64)
+    for ledger in ledgers:
+        totals += np.bincount(ledger.channel, weights=ledger.value, minlength=len(channels))
+        touches += np.bincount(ledger.channel, minlength=len(channels))
+
+    credited = touches > 0
+    return pd.DataFrame({'channel': np.asarray(channels)[credited], 'value': totals[credited]})
+
+
+# Models whose credit is assigned per touch by fixed rules (see MarketingAttribution._credit_rows)
+RULE_BASED_MODELS = ['last_click', 'first_click', 'linear', 'time_decay', 'multi_touch']
+
+
 class MarketingAttribution:
     def __init__(self, touchpoints_df, conversions_df):
         """
@@ -20,153 +146,276 @@ class MarketingAttribution:
         self.conversions = conversions_df.copy()
         self.touchpoints['timestamp'] = pd.to_datetime(self.touchpoints['timestamp'])
         self.conversions['timestamp'] = pd.to_datetime(self.conversions['timestamp'])
+        self._journey_index = None
+
+    def build_journey_index(self):
+        """
+        Build (once) a sorted index of customer journeys
+
+        Touchpoints are sorted by customer and timestamp so the touches preceding each
+        conversion form one contiguous run [conv_start, conv_start + conv_count).
+        Conversions are grouped by customer the same way for per-customer lookups.
+        """
+        if self._journey_index is not None:
+            return self._journey_index
+
+        customers = pd.Index(self.touchpoints['customer_id'].unique()).sort_values()
+        touch_codes = customers.get_indexer(self.touchpoints['customer_id'])
+        touch_times = self.touchpoints['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64')
+        touch_order = np.lexsort((touch_times, touch_codes))
+        touch_codes = touch_codes[touch_order]
+        touch_times = touch_times[touch_order]
+        channel_codes, channels = pd.factorize(self.touchpoints['channel'].to_numpy()[touch_order], sort=True)
+        customer_start = np.searchsorted(touch_codes, np.arange(len(customers)))
+
+        conv_codes = customers.get_indexer(self.conversions['customer_id'])
+        conv_times = self.conversions['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64')
+
+        # Merge touches and conversions on (customer, timestamp); touches sort ahead of a
+        # conversion with the same timestamp, matching the `timestamp <= conversion` filter
+        n_touches = len(touch_codes)
+        kinds = np.concatenate([np.zeros(n_touches, dtype=np.int8), np.ones(len(conv_codes), dtype=np.int8)])
+        merged_order = np.lexsort((
+            kinds,
+            np.concatenate([touch_times, conv_times]),
+            np.concatenate([touch_codes, conv_codes])
+        ))
+        is_conversion = kinds[merged_order] == 1
+        touches_seen = np.cumsum(~is_conversion)
+        conv_end = np.empty(len(conv_codes), dtype=np.int64)
+        conv_end[merged_order[is_conversion] - n_touches] = touches_seen[is_conversion]
+
+        conv_start = conv_end.copy()
+        known = conv_codes >= 0
+        conv_start[known] = customer_start[conv_codes[known]]
+
+        conv_order = np.argsort(conv_codes, kind='stable')
+        conv_customer_start = np.searchsorted(conv_codes[conv_order], np.arange(len(customers) + 1))
+
+        # Integer conversion ids go into the ledger as-is; any other ids (e.g. 'ORD-0') are
+        # factorized and their labels kept alongside the codes, like the channel names
+        conversion_labels = None
+        if 'conversion_id' not in self.conversions.columns:
+            conversion_codes = np.arange(len(self.conversions))
+        elif (pd.api.types.is_integer_dtype(self.conversions['conversion_id'])
+              and not self.conversions['conversion_id'].hasnans):
+            conversion_codes = self.conversions['conversion_id'].to_numpy(dtype=np.int64)
+        else:
+            conversion_codes, labels = pd.factorize(self.conversions['conversion_id'], use_na_sentinel=False)
+            conversion_labels = np.asarray(labels, dtype=object)
+
+        self._journey_index = {
+            'customers': customers,
+            'touch_order': touch_order,
+            'touch_times': touch_times,
+            'channel_codes': channel_codes,
+            'channels': channels,
+            'conv_start': conv_start,
+            'conv_count': conv_end - conv_start,
+            'conv_times': conv_times,
+            'conv_values': self.conversions['conversion_value'].to_numpy(dtype=np.float64),
+            'conversion_codes': conversion_codes,
+            'conversion_labels': conversion_labels,
+            'conv_order': conv_order,
+            'conv_customer_start': conv_customer_start
+        }
+        return self._journey_index
+
+    def _credit_rows(self, conv_idx, model, half_life=7, position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
+        """
+        Expand conversions into credited touches for a rule-based model
+
+        Returns (conversion positions, touch index within the journey, sorted touch rows, weights),
+        following the same weighting rules as the corresponding *_attribution method.
+        """
+        index = self.build_journey_index()
+        starts = index['conv_start'][conv_idx]
+        counts = index['conv_count'][conv_idx]
+        has_touches = counts > 0
+        conv_idx, starts, counts = conv_idx[has_touches], starts[has_touches], counts[has_touches]
+
+        if model not in RULE_BASED_MODELS:
+            raise ValueError(f"Unknown rule-based attribution model: {model}")
+
+        if model in ('last_click', 'first_click'):
+            touch_index = counts - 1 if model == 'last_click' else np.zeros_like(counts)
+            return conv_idx, touch_index, starts + touch_index, np.ones(len(conv_idx))
+
+        row_conv = np.repeat(np.arange(len(conv_idx)), counts)
+        touch_index = np.arange(len(row_conv)) - np.repeat(np.cumsum(counts) - counts, counts)
+        touch_rows = starts[row_conv] + touch_index
+        n_touches = counts[row_conv]
+
+        if model == 'linear':
+            weights = 1.0 / n_touches
+        elif model == 'time_decay':
+            time_diffs = (index['conv_times'][conv_idx][row_conv] - index['touch_times'][touch_rows]) / (24 * 3600 * 1e9)
+            decay = np.exp(-np.log(2) * time_diffs / half_life)
+            weights = decay / np.bincount(row_conv, weights=decay, minlength=len(conv_idx))[row_conv]
+        elif model == 'multi_touch':
+            weights = position_weights['middle'] / np.maximum(n_touches - 2, 1).astype(np.float64)
+            weights[touch_index == 0] = position_weights['first']
+            weights[touch_index == n_touches - 1] = position_weights['last']
+            weights[n_touches == 1] = 1
+
+        return conv_idx[row_conv], touch_index, touch_rows, weights
+
+    def journey_credit(self, customer_ids, model='linear', half_life=7, position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
+        """
+        Per-touch credit for the conversions of the given customers
+
+        Parameters:
+        customer_ids: iterable of customer ids to look up
+        model: one of 'last_click', 'first_click', 'linear', 'time_decay', 'multi_touch'
+
+        Returns:
+        DataFrame with one row per credited touch
+        """
+        index = self.build_journey_index()
+        codes = index['customers'].get_indexer(pd.Index(pd.unique(np.asarray(list(customer_ids)))))
+        codes = codes[codes >= 0]
+        bounds = index['conv_customer_start']
+        conv_idx = np.concatenate(
+            [index['conv_order'][bounds[code]:bounds[code + 1]] for code in codes]
+            + [np.empty(0, dtype=np.int64)]
+        )
+
+        rows_conv, touch_index, touch_rows, weights = self._credit_rows(conv_idx, model, half_life, position_weights)
+        touches = self.touchpoints.iloc[index['touch_order'][touch_rows]]
+
+        return pd.DataFrame({
+            'customer_id': touches['customer_id'].to_numpy(),
+            'conversion_id': self.conversions['conversion_id'].to_numpy()[rows_conv]
+            if 'conversion_id' in self.conversions.columns else rows_conv,
+            'conversion_timestamp': self.conversions['timestamp'].to_numpy()[rows_conv],
+            'touch_index': touch_index,
+            'timestamp': touches['timestamp'].to_numpy(),
+            'channel': index['channels'][index['channel_codes'][touch_rows]],
+            'weight': weights,
+            'value': weights * index['conv_values'][rows_conv]
+        })
+
+    def iter_credit_ledger(self, model='linear', chunk_rows=5_000_000, half_life=7,
+                           position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}, include_touch_rows=False,
+                           include_conversion_rows=False):
+        """
+        Stream the credit ledger of a rule-based model in chunks of about chunk_rows credited touches
+
+        Conversions are never split across chunks, so memory stays bounded by chunk_rows
+        (or the longest single journey) however many touches are credited in total.
+        With include_touch_rows / include_conversion_rows each row also carries the position of its
+        touch in the touchpoints table / of its conversion in the conversions table.
+        """
+        index = self.build_journey_index()
+        counts = index['conv_count']
+        if model in ('last_click', 'first_click'):
+            counts = (counts > 0).astype(np.int64)
+        rows_before = np.concatenate([[0], np.cumsum(counts)])
+
+        start = 0
+        while start < len(counts):
+            end = np.searchsorted(rows_before, rows_before[start] + chunk_rows, side='right') - 1
+            end = min(max(end, start + 1), len(counts))
+            conv_idx = np.arange(start, end)
+            rows_conv, touch_index, touch_rows, weights = self._credit_rows(conv_idx, model, half_life, position_weights)
+            yield CreditLedger(
+                index['conversion_codes'][rows_conv],
+                touch_index,
+                index['channel_codes'][touch_rows],
+                weights,
+                weights * index['conv_values'][rows_conv],
+                index['channels'],
+                index['touch_order'][touch_rows] if include_touch_rows else None,
+                index['conversion_labels'],
+                rows_conv if include_conversion_rows else None
+            )
+            start = end
+
+    def credit_ledger(self, model='linear', chunk_rows=5_000_000, half_life=7,
+                      position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
+        """Full per-conversion, per-touch credit ledger of a rule-based model as one CreditLedger"""
+        return CreditLedger.concat(
+            list(self.iter_credit_ledger(model, chunk_rows, half_life, position_weights)),
+            self.build_journey_index()['channels'],
+            self.build_journey_index()['conversion_labels']
+        )
+
+    def write_credit_ledger(self, path, model='linear', chunk_rows=5_000_000, half_life=7,
+                            position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
+        """Stream the credit ledger of a rule-based model to a Parquet file, one row group per chunk"""
+        pq = _import_pyarrow('parquet')
+        writer = None
+        try:
+            for chunk in self.iter_credit_ledger(model, chunk_rows, half_life, position_weights):
+                table = chunk.to_arrow()
+                if writer is None:
+                    writer = pq.ParquetWriter(path, table.schema)
+                writer.write_table(table)
+            if writer is None:
+                index = self.build_journey_index()
+                pq.write_table(CreditLedger.concat([], index['channels'], index['conversion_labels']).to_arrow(), path)
+        finally:
+            if writer is not None:
+                writer.close()
 
     def last_click_attribution(self):
         """A. Last-click attribution: Assigns 100% credit to the last touchpoint"""
-        results = []
-        
-        for _, conversion in self.conversions.iterrows():
-            # Get touchpoints before conversion
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ]
-            
-            if not customer_touches.empty:
-                last_touch = customer_touches.sort_values('timestamp').iloc[-1]
-                results.append({
-                    'channel': last_touch['channel'],
-                    'value': conversion['conversion_value']
-                })
-        
-        return pd.DataFrame(results).groupby('channel')['value'].sum().reset_index()
+        return summarize_ledger(self.iter_credit_ledger('last_click'), self.build_journey_index()['channels'])
 
     def first_click_attribution(self):
         """B. First-click attribution: Assigns 100% credit to the first touchpoint"""
-        results = []
-        
-        for _, conversion in self.conversions.iterrows():
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ]
-            
-            if not customer_touches.empty:
-                first_touch = customer_touches.sort_values('timestamp').iloc[0]
-                results.append({
-                    'channel': first_touch['channel'],
-                    'value': conversion['conversion_value']
-                })
-        
-        return pd.DataFrame(results).groupby('channel')['value'].sum().reset_index()
+        return summarize_ledger(self.iter_credit_ledger('first_click'), self.build_journey_index()['channels'])
 
     def linear_attribution(self):
         """C. Linear attribution: Distributes credit equally across all touchpoints"""
-        results = []
-        
-        for _, conversion in self.conversions.iterrows():
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ]
-            
-            if not customer_touches.empty:
-                value_per_touch = conversion['conversion_value'] / len(customer_touches)
-                for _, touch in customer_touches.iterrows():
-                    results.append({
-                        'channel': touch['channel'],
-                        'value': value_per_touch
-                    })
-        
-        return pd.DataFrame(results).groupby('channel')['value'].sum().reset_index()
+        return summarize_ledger(self.iter_credit_ledger('linear'), self.build_journey_index()['channels'])
 
     def time_decay_attribution(self, half_life=7):
         """D. Time-decay attribution: Assigns more credit to touchpoints closer to conversion"""
-        results = []
-        
-        for _, conversion in self.conversions.iterrows():
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ]
-            
-            if not customer_touches.empty:
-                # Calculate time weights
-                time_diffs = (conversion['timestamp'] - customer_touches['timestamp']).dt.total_seconds() / (24 * 3600)
-                weights = np.exp(-np.log(2) * time_diffs / half_life)
-                total_weight = weights.sum()
-                
-                # Distribute value based on weights
-                for weight, (_, touch) in zip(weights, customer_touches.iterrows()):
-                    results.append({
-                        'channel': touch['channel'],
-                        'value': conversion['conversion_value'] * (weight / total_weight)
-                    })
-        
-        return pd.DataFrame(results).groupby('channel')['value'].sum().reset_index()
+        return summarize_ledger(
+            self.iter_credit_ledger('time_decay', half_life=half_life),
+            self.build_journey_index()['channels']
+        )
 
     def multi_touch_attribution(self, position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
         """E. Multi-touch attribution: Assigns different weights based on position"""
-        results = []
-        
-        for _, conversion in self.conversions.iterrows():
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ].sort_values('timestamp')
-            
-            if not customer_touches.empty:
-                n_touches = len(customer_touches)
-                
-                for idx, (_, touch) in enumerate(customer_touches.iterrows()):
-                    if n_touches == 1:
-                        weight = 1
-                    elif idx == 0:
-                        weight = position_weights['first']
-                    elif idx == n_touches - 1:
-                        weight = position_weights['last']
-                    else:
-                        weight = position_weights['middle'] / (n_touches - 2) if n_touches > 2 else position_weights['middle']
-                    
-                    results.append({
-                        'channel': touch['channel'],
-                        'value': conversion['conversion_value'] * weight
-                    })
-        
-        return pd.DataFrame(results).groupby('channel')['value'].sum().reset_index()
+        return summarize_ledger(
+            self.iter_credit_ledger('multi_touch', position_weights=position_weights),
+            self.build_journey_index()['channels']
+        )
 
     def algorithmic_attribution(self):
         """F. Algorithmic attribution: Uses machine learning to determine channel importance"""
-        # Prepare features for each conversion
-        features = []
-        values = []
-        
-        for _, conversion in self.conversions.iterrows():
-            customer_touches = self.touchpoints[
-                (self.touchpoints['customer_id'] == conversion['customer_id']) &
-                (self.touchpoints['timestamp'] <= conversion['timestamp'])
-            ]
-            
-            if not customer_touches.empty:
-                # Create channel presence features
-                channel_counts = customer_touches['channel'].value_counts()
-                channel_features = pd.Series(0, index=self.touchpoints['channel'].unique())
-                channel_features[channel_counts.index] = channel_counts
-                
-                features.append(channel_features)
-                values.append(conversion['conversion_value'])
-        
-        if features:
+        # Channel touch counts per converting journey, as a (conversion x channel) matrix built
+        # from the journey index; columns keep the touchpoints' channel order
+        index = self.build_journey_index()
+        n_channels = len(index['channels'])
+        has_touches = index['conv_count'] > 0
+        dense_conversion = np.cumsum(has_touches) - 1
+        n_rows = int(has_touches.sum())
+
+        counts = np.zeros(n_rows * n_channels, dtype=np.int64)
+        for ledger in self.iter_credit_ledger('linear', include_conversion_rows=True):
+            counts += np.bincount(
+                dense_conversion[ledger.conversion_row] * n_channels + ledger.channel, minlength=n_rows * n_channels
+            )
+
+        if n_rows:
+            channel_order = pd.Index(index['channels']).get_indexer(self.touchpoints['channel'].unique())
+            X = pd.DataFrame(
+                counts.reshape(n_rows, n_channels)[:, channel_order],
+                columns=np.asarray(index['channels'])[channel_order]
+            )
+            values = index['conv_values'][has_touches]
+
             # Train Random Forest model
-            X = pd.DataFrame(features)
-            y = values
             model = RandomForestRegressor(n_estimators=100, random_state=42)
-            model.fit(X, y)
+            model.fit(X, values)
             
             # Calculate channel importance
             importance = pd.DataFrame({
                 'channel': X.columns,
-                'value': model.feature_importances_ * sum(values)
+                'value': model.feature_importances_ * values.sum()
             })
             return importance.sort_values('value', ascending=False)
         
@@ -277,30 +526,31 @@ def generate_sample_data(n_customers=1000, n_touchpoints=5000, n_conversions=500
         control_group
     )
 
-# Generate sample data
-touchpoints_df, conversions_df, control_group_df = generate_sample_data()
-
-# Initialize attribution model
-attribution = MarketingAttribution(touchpoints_df, conversions_df)
-
-# Run all attribution models and save results
-results = {
-    'last_click': attribution.last_click_attribution(),
-    'first_click': attribution.first_click_attribution(),
-    'linear': attribution.linear_attribution(),
-    'time_decay': attribution.time_decay_attribution(),
-    'multi_touch': attribution.multi_touch_attribution(),
-    'algorithmic': attribution.algorithmic_attribution(),
-    'probabilistic': attribution.probabilistic_attribution(),
-    'incremental': attribution.incremental_attribution(control_group_df)
-}
-
-# Save results to CSV files
-for model_name, result_df in results.items():
-    result_df.to_csv(f'attribution_{model_name}.csv', index=False)
-
-# Print summary of results
-print("\nMarketing Attribution Analysis Summary:")
-for model_name, result_df in results.items():
-    print(f"\n{model_name.replace('_', ' ').title()} Attribution Results:")
-    print(result_df)
+if __name__ == '__main__':
+    # Generate sample data
+    touchpoints_df, conversions_df, control_group_df = generate_sample_data()
+
+    # Initialize attribution model
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+
+    # Run all attribution models and save results
+    results = {
+        'last_click': attribution.last_click_attribution(),
+        'first_click': attribution.first_click_attribution(),
+        'linear': attribution.linear_attribution(),
+        'time_decay': attribution.time_decay_attribution(),
+        'multi_touch': attribution.multi_touch_attribution(),
+        'algorithmic': attribution.algorithmic_attribution(),
+        'probabilistic': attribution.probabilistic_attribution(),
+        'incremental': attribution.incremental_attribution(control_group_df)
+    }
+
+    # Save results to CSV files
+    for model_name, result_df in results.items():
+        result_df.to_csv(f'attribution_{model_name}.csv', index=False)
+
+    # Print summary of results
+    print("\nMarketing Attribution Analysis Summary:")
+    for model_name, result_df in results.items():
+        print(f"\n{model_name.replace('_', ' ').title()} Attribution Results:")
+        print(result_df)
@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+from script_loader import load_script
+
+attribution_module = load_script('marketing-attribution.py')
+MarketingAttribution = attribution_module.MarketingAttribution
+RULE_BASED_MODELS = attribution_module.RULE_BASED_MODELS
+
+# campaign_type in sample_campaign_data.csv -> channel used by MarketingAttribution
+CAMPAIGN_TYPE_CHANNELS = {
+    'Email': 'Email',
+    'Social': 'Social Media',
+    'Display': 'Display',
+    'Search': 'Paid Search',
+    'Content': 'Organic Search'
+}
+
+CHANNEL_MODELS = ['algorithmic', 'probabilistic', 'incremental']
+
+
+class CampaignAttribution:
+    def __init__(self, attribution, campaign_df, type_channels=CAMPAIGN_TYPE_CHANNELS, control_group_df=None):
+        """
+        Campaign-level attribution, ROAS and CPA on top of a MarketingAttribution instance
+
+        Parameters:
+        attribution: MarketingAttribution with the touchpoints and conversions to attribute
+        campaign_df: DataFrame with columns [campaign_id, campaign_name, campaign_type, budget, clicks, ...]
+        type_channels: Mapping from campaign_type to attribution channel
+        control_group_df: Control group for incremental attribution (incremental is skipped without it)
+
+        When the touchpoints carry a campaign_id column, rule-based credit goes straight to
+        the touched campaign. Otherwise (touches without a known campaign, and the channel-level
+        models) each channel's credit is split across its campaigns in proportion to campaign
+        clicks, so campaign revenue reconciles with the channel totals for every channel that
+        has at least one campaign.
+        """
+        self.attribution = attribution
+        self.control_group = control_group_df
+        index = attribution.build_journey_index()
+        channels = pd.Index(index['channels'])
+
+        # Precomputed campaign -> channel mapping and click share within each channel
+        self.campaigns = campaign_df.reset_index(drop=True).copy()
+        self.campaigns['channel'] = self.campaigns['campaign_type'].map(type_channels)
+        self.campaign_channel = channels.get_indexer(self.campaigns['channel'])
+        mapped = self.campaign_channel >= 0
+        clicks = self.campaigns['clicks'].to_numpy(dtype=np.float64) * mapped
+        channel_clicks = np.bincount(self.campaign_channel[mapped], weights=clicks[mapped], minlength=len(channels))
+        self.click_share = np.divide(
+            clicks, channel_clicks[np.maximum(self.campaign_channel, 0)],
+            out=np.zeros(len(clicks)), where=mapped & (clicks > 0)
+        )
+
+        self.touch_campaign = None
+        if 'campaign_id' in attribution.touchpoints.columns:
+            self.touch_campaign = pd.Index(self.campaigns['campaign_id']).get_indexer(
+                attribution.touchpoints['campaign_id']
+            )
+
+        self.average_conversion_value = attribution.conversions['conversion_value'].mean()
+
+    def _allocate(self, channel_revenue, channel_conversions):
+        """Split per-channel revenue and conversions across campaigns by click share"""
+        mapped = self.campaign_channel >= 0
+        channel_idx = np.maximum(self.campaign_channel, 0)
+        revenue = np.where(mapped, channel_revenue[channel_idx] * self.click_share, 0.0)
+        conversions = np.where(mapped, channel_conversions[channel_idx] * self.click_share, 0.0)
+        return revenue, conversions
+
+    def _ledger_credit(self, model):
+        """
+        Attributed revenue and (fractional) conversions per campaign from the streamed credit ledger
+
+        Touches with a known campaign_id are credited to that campaign; all other credit
+        (no campaign_id column, or a missing / unknown campaign) is split by click share.
+        """
+        n_channels = len(self.attribution.build_journey_index()['channels'])
+        n_campaigns = len(self.campaigns)
+        campaign_revenue = np.zeros(n_campaigns)
+        campaign_conversions = np.zeros(n_campaigns)
+        channel_revenue = np.zeros(n_channels)
+        channel_conversions = np.zeros(n_channels)
+
+        for ledger in self.attribution.iter_credit_ledger(model, include_touch_rows=self.touch_campaign is not None):
+            unmatched = np.ones(len(ledger), dtype=bool)
+            if self.touch_campaign is not None:
+                codes = self.touch_campaign[ledger.touch_row]
+                unmatched = codes < 0
+                matched = ~unmatched
+                campaign_revenue += np.bincount(codes[matched], weights=ledger.value[matched], minlength=n_campaigns)
+                campaign_conversions += np.bincount(codes[matched], weights=ledger.weight[matched], minlength=n_campaigns)
+
+            channel = ledger.channel[unmatched]
+            channel_revenue += np.bincount(channel, weights=ledger.value[unmatched], minlength=n_channels)
+            channel_conversions += np.bincount(channel, weights=ledger.weight[unmatched], minlength=n_channels)
+
+        allocated_revenue, allocated_conversions = self._allocate(channel_revenue, channel_conversions)
+        return campaign_revenue + allocated_revenue, campaign_conversions + allocated_conversions
+
+    def _channel_model_credit(self, model):
+        """Attributed revenue per campaign for the models that only report channel totals"""
+        if model == 'incremental':
+            if self.control_group is None:
+                raise ValueError("Incremental attribution requires a control group (control_group_df)")
+            result = self.attribution.incremental_attribution(self.control_group)
+        else:
+            result = getattr(self.attribution, f'{model}_attribution')()
+
+        channels = pd.Index(self.attribution.build_journey_index()['channels'])
+        codes = channels.get_indexer(result['channel'])
+        known = codes >= 0
+        channel_revenue = np.bincount(
+            codes[known], weights=result['value'].to_numpy(dtype=np.float64)[known], minlength=len(channels)
+        )
+        # Without per-conversion credit, conversions are estimated from the average conversion value
+        return self._allocate(channel_revenue, channel_revenue / self.average_conversion_value)
+
+    def campaign_attribution(self, model='linear'):
+        """
+        Campaign-level results for one attribution model
+
+        Returns:
+        DataFrame with attributed revenue, attributed conversions, ROAS and attributed CPA per campaign
+        """
+        if model in RULE_BASED_MODELS:
+            revenue, conversions = self._ledger_credit(model)
+        elif model in CHANNEL_MODELS:
+            revenue, conversions = self._channel_model_credit(model)
+        else:
+            raise ValueError(f"Unknown attribution model: {model}")
+
+        budget = self.campaigns['budget'].to_numpy(dtype=np.float64)
+        result = self.campaigns[['campaign_id', 'campaign_name', 'campaign_type', 'channel', 'budget', 'cpa']].copy()
+        result['attributed_revenue'] = revenue
+        result['attributed_conversions'] = conversions
+        result['roas'] = np.divide(revenue, budget, out=np.full(len(budget), np.nan), where=budget > 0)
+        result['attributed_cpa'] = np.divide(
+            budget, conversions, out=np.full(len(budget), np.nan), where=conversions > 0
+        )
+        return result
+
+    def run_all_models(self):
+        """Campaign-level results for all eight models in one long DataFrame (incremental needs a control group)"""
+        models = RULE_BASED_MODELS + CHANNEL_MODELS
+        if self.control_group is None:
+            models = [model for model in models if model != 'incremental']
+
+        results = []
+        for model in models:
+            result = self.campaign_attribution(model)
+            result.insert(0, 'model', model)
+            results.append(result)
+        return pd.concat(results, ignore_index=True)
+
+
+if __name__ == '__main__':
+    # Attribute the generated sample journeys to the campaigns in sample_campaign_data.csv
+    touchpoints_df, conversions_df, control_group_df = attribution_module.generate_sample_data()
+    campaign_df = pd.read_csv('sample_campaign_data.csv')
+
+    campaign_attribution = CampaignAttribution(
+        MarketingAttribution(touchpoints_df, conversions_df), campaign_df, control_group_df=control_group_df
+    )
+    results_df = campaign_attribution.run_all_models()
+    results_df.to_csv('attribution_campaigns.csv', index=False)
+
+    print("\nCampaign Attribution Summary (ROAS by model):")
+    print(results_df.pivot_table(index='campaign_type', columns='model', values='roas', aggfunc='mean'))
+    print("\nSample Campaign Attribution Data:")
+    print(results_df.head())
@@ -0,0 +1,228 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from script_loader import load_script
+
+calculate_rfm_scores = load_script('marketing-rfm-scoring.py').calculate_rfm_scores
+
+LOYALTY_TIERS = ['Bronze', 'Silver', 'Gold', 'Platinum']
+CUSTOMER_SEGMENTS = ['Champions', 'Loyal Customers', 'Potential Loyalists', 'At Risk', 'Lost Customers']
+
+
+def _customer_spine(customer_ids):
+    """Unique customer ids (numeric or string), sorted when the ids are comparable"""
+    spine = pd.Index(pd.unique(customer_ids.dropna()))
+    try:
+        return spine.sort_values()
+    except TypeError:
+        return spine
+
+
+def _sorted_by_key(spine, keys, table_name, **columns):
+    """
+    Encode a table's customer key as its position in the customer spine and sort by it once
+
+    Rows whose key is missing or not a known customer are dropped; if a table has keys but
+    none of them match the spine (e.g. string ids against numeric ones) a ValueError is raised.
+    """
+    keys = pd.Series(keys)
+    codes = spine.get_indexer(keys)
+    if keys.notna().any() and not (codes >= 0).any():
+        raise ValueError(f"No {table_name} keys match a customer_id in the customer table")
+
+    matched = codes >= 0
+    order = np.argsort(codes[matched], kind='stable')
+    table = {'key': codes[matched][order]}
+    for name, values in columns.items():
+        table[name] = np.asarray(values)[matched][order]
+    return table
+
+
+def _merge_join(start, end, table):
+    """
+    Merge-join a sorted table onto the customers at spine positions [start, end)
+
+    Returns (positions relative to start, row slice of the table) for the table rows
+    belonging to those customers.
+    """
+    lo = np.searchsorted(table['key'], start, side='left')
+    hi = np.searchsorted(table['key'], end, side='left')
+    return table['key'][lo:hi] - start, np.arange(lo, hi)
+
+
+class Customer360:
+    def __init__(self, customer_df, engagement_df, purchase_df, referral_df, loyalty_df,
+                 rfm_df=None, partition_size=250_000, n_workers=None):
+        """
+        Customer-keyed join engine over the generated marketing tables
+
+        Each table is reduced to the columns the features need and sorted by customer
+        once; features are then built partition by partition (ranges of the sorted
+        customer spine) with merge-joins, so memory is bounded by the partition size.
+
+        Parameters:
+        customer_df, engagement_df, purchase_df, referral_df, loyalty_df: Tables from marketing-data-generator.py
+        rfm_df: Optional precomputed calculate_rfm_scores output (computed from purchase_df otherwise)
+        partition_size: Number of customers per partition
+        n_workers: Threads used to build partitions in parallel (defaults to the CPU count)
+        """
+        self.partition_size = partition_size
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+        customer_df = customer_df.drop_duplicates('customer_id')
+        self.customer_ids = _customer_spine(customer_df['customer_id'])
+        self.customers = _sorted_by_key(
+            self.customer_ids, customer_df['customer_id'], 'customer',
+            **{column: customer_df[column] for column in ['age_group', 'location', 'acquisition_source']
+               if column in customer_df.columns}
+        )
+
+        event_codes, self.event_types = pd.factorize(engagement_df['event_type'], sort=True)
+        self.engagement = _sorted_by_key(
+            self.customer_ids, engagement_df['customer_id'], 'engagement', event_type=event_codes,
+            value=engagement_df['value'].fillna(0).to_numpy(dtype=np.float64)
+        )
+
+        self.referrals_sent = _sorted_by_key(
+            self.customer_ids, referral_df['referrer_id'], 'referrer',
+            converted=(referral_df['status'] == 'Converted').to_numpy(dtype=np.float64),
+            bonus=referral_df['referral_bonus'].fillna(0).to_numpy(dtype=np.float64)
+        )
+        self.referrals_received = _sorted_by_key(
+            self.customer_ids, referral_df['referred_customer_id'], 'referred customer'
+        )
+
+        self.loyalty = _sorted_by_key(
+            self.customer_ids, loyalty_df['customer_id'], 'loyalty',
+            tier=pd.Categorical(loyalty_df['tier'], categories=LOYALTY_TIERS).codes,
+            loyalty_points=loyalty_df['loyalty_points'].to_numpy(dtype=np.float64),
+            remaining_points=loyalty_df['remaining_points'].to_numpy(dtype=np.float64)
+        )
+
+        if rfm_df is None:
+            rfm_df = calculate_rfm_scores(purchase_df.copy())
+        self.rfm = _sorted_by_key(
+            self.customer_ids, rfm_df['customer_id'], 'RFM',
+            recency=rfm_df['recency'].to_numpy(dtype=np.float64),
+            frequency=rfm_df['frequency'].to_numpy(dtype=np.float64),
+            monetary=rfm_df['monetary'].to_numpy(dtype=np.float64),
+            R=rfm_df['R'].astype(int).to_numpy(),
+            F=rfm_df['F'].astype(int).to_numpy(),
+            M=rfm_df['M'].astype(int).to_numpy(),
+            rfm_score=rfm_df['rfm_score'].to_numpy(dtype=np.float64),
+            segment=pd.Categorical(rfm_df['customer_segment'], categories=CUSTOMER_SEGMENTS).codes
+        )
+
+    @classmethod
+    def from_csv(cls, directory='.', **kwargs):
+        """Load the sample_*.csv files written by marketing-data-generator.py"""
+        def read(name, columns):
+            return pd.read_csv(os.path.join(directory, f'sample_{name}_data.csv'), usecols=columns)
+
+        return cls(
+            read('customer', ['customer_id', 'age_group', 'location', 'acquisition_source']),
+            read('engagement', ['customer_id', 'event_type', 'value']),
+            read('purchase', ['purchase_id', 'customer_id', 'purchase_date', 'purchase_amount']),
+            read('referral', ['referrer_id', 'status', 'referral_bonus', 'referred_customer_id']),
+            read('loyalty', ['customer_id', 'tier', 'loyalty_points', 'remaining_points']),
+            **kwargs
+        )
+
+    def _one_to_one(self, start, end, table, column, fill):
+        """Look up a per-customer column (loyalty, RFM) for every customer in the slice"""
+        positions, rows = _merge_join(start, end, table)
+        values = np.full(end - start, fill, dtype=np.result_type(table[column].dtype, np.asarray(fill).dtype))
+        values[positions] = table[column][rows]
+        return values
+
+    def build_partition(self, start, end):
+        """Feature vectors for the customers at positions [start, end) of the sorted spine"""
+        end = min(end, len(self.customer_ids))
+        n = end - start
+        features = {'customer_id': self.customer_ids[start:end].to_numpy()}
+        for column in ['age_group', 'location', 'acquisition_source']:
+            if column in self.customers:
+                features[column] = self.customers[column][start:end]
+
+        # Engagement counts by event_type via one bincount over (customer, event_type) cells
+        positions, rows = _merge_join(start, end, self.engagement)
+        event_codes = self.engagement['event_type'][rows]
+        typed = event_codes >= 0
+        n_types = len(self.event_types)
+        counts = np.bincount(
+            positions[typed] * n_types + event_codes[typed], minlength=n * n_types
+        ).reshape(n, n_types)
+        for type_idx, event_type in enumerate(self.event_types):
+            features[f'engagement_{event_type}'] = counts[:, type_idx]
+        features['engagement_value'] = np.bincount(positions, weights=self.engagement['value'][rows], minlength=n)
+
+        positions, rows = _merge_join(start, end, self.referrals_sent)
+        features['referrals_sent'] = np.bincount(positions, minlength=n)
+        features['referral_conversions'] = np.bincount(
+            positions, weights=self.referrals_sent['converted'][rows], minlength=n
+        ).astype(np.int64)
+        features['referral_bonus_total'] = np.bincount(
+            positions, weights=self.referrals_sent['bonus'][rows], minlength=n
+        )
+
+        positions, _ = _merge_join(start, end, self.referrals_received)
+        features['was_referred'] = np.bincount(positions, minlength=n) > 0
+
+        features['loyalty_tier'] = pd.Categorical.from_codes(
+            self._one_to_one(start, end, self.loyalty, 'tier', -1), categories=LOYALTY_TIERS
+        )
+        for column in ['loyalty_points', 'remaining_points']:
+            features[column] = self._one_to_one(start, end, self.loyalty, column, np.nan)
+
+        for column in ['recency', 'frequency', 'monetary', 'rfm_score']:
+            features[column] = self._one_to_one(start, end, self.rfm, column, np.nan)
+        for column in ['R', 'F', 'M']:
+            scores = self._one_to_one(start, end, self.rfm, column, 0)
+            features[column] = pd.arrays.IntegerArray(scores.astype(np.int8), mask=scores == 0)
+        features['customer_segment'] = pd.Categorical.from_codes(
+            self._one_to_one(start, end, self.rfm, 'segment', -1), categories=CUSTOMER_SEGMENTS
+        )
+
+        return pd.DataFrame(features)
+
+    def iter_features(self):
+        """
+        Yield per-customer feature partitions in customer_id order
+
+        Partitions are built on a thread pool (the work is numpy, which releases the GIL)
+        with at most two partitions per worker in flight, keeping memory bounded.
+        """
+        bounds = range(0, len(self.customer_ids), self.partition_size)
+        with ThreadPoolExecutor(max_workers=self.n_workers) as executor:
+            pending = deque()
+            for start in bounds:
+                pending.append(executor.submit(self.build_partition, start, start + self.partition_size))
+                if len(pending) >= 2 * self.n_workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def features(self):
+        """All per-customer feature vectors as one DataFrame"""
+        return pd.concat(list(self.iter_features()), ignore_index=True)
+
+    def write_features(self, path):
+        """Stream the feature vectors to a CSV file one partition at a time"""
+        for idx, partition in enumerate(self.iter_features()):
+            partition.to_csv(path, mode='w' if idx == 0 else 'a', header=idx == 0, index=False)
+
+
+if __name__ == '__main__':
+    # Join the sample datasets written by marketing-data-generator.py
+    engine = Customer360.from_csv()
+    engine.write_features('sample_customer_360_data.csv')
+
+    customer_360_df = pd.read_csv('sample_customer_360_data.csv')
+    print("\nCustomer 360 Feature Summary:")
+    print(customer_360_df.describe())
+    print("\nSample Customer 360 Data:")
+    print(customer_360_df.head())
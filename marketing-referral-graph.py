@@ -0,0 +1,319 @@
+import numpy as np
+import pandas as pd
+
+from script_loader import load_script
+
+attribution_module = load_script('marketing-attribution.py')
+MarketingAttribution = attribution_module.MarketingAttribution
+RULE_BASED_MODELS = attribution_module.RULE_BASED_MODELS
+
+
+def _node_keys(ids):
+    """Customer ids as an array, reading whole-number floats (from a column with gaps) as int64"""
+    ids = np.asarray(ids)
+    if ids.dtype.kind == 'f' and np.array_equal(ids, np.floor(ids)):
+        return ids.astype(np.int64)
+    return ids
+
+
+class ReferralGraph:
+    def __init__(self, referral_df, customer_value=None):
+        """
+        Referrer -> referred customer graph stored as CSR (compressed sparse row) arrays
+
+        Parameters:
+        referral_df: DataFrame with columns [referrer_id, referral_date, status, referral_bonus, referred_customer_id]
+        customer_value: Optional Series of conversion value per customer_id (e.g. total purchase amount)
+
+        Only converted referrals have a referred customer, so they form the edges; every
+        referral still counts towards its referrer's sent totals. Node ids are customer ids
+        (numeric or string) mapped to dense codes; the out-edges of node i are
+        indices[indptr[i]:indptr[i + 1]]. Repeated referrals of the same customer by the
+        same referrer form a single edge.
+        """
+        has_referrer = referral_df['referrer_id'].notna().to_numpy()
+        converted = (
+            (referral_df['status'] == 'Converted').to_numpy()
+            & referral_df['referred_customer_id'].notna().to_numpy() & has_referrer
+        )
+        bonus = referral_df['referral_bonus'].fillna(0).to_numpy(dtype=np.float64)
+        referrer = _node_keys(referral_df['referrer_id'][has_referrer])
+        referred = _node_keys(referral_df['referred_customer_id'][converted])
+
+        # Nodes are the union of referrer and referred ids, sorted when the ids are comparable
+        self.node_index = pd.Index(pd.unique(np.concatenate([referrer, referred])))
+        try:
+            self.node_index = self.node_index.sort_values()
+        except TypeError:
+            pass
+        self.nodes = self.node_index.to_numpy()
+        n_nodes = len(self.nodes)
+
+        referrer_codes = np.full(len(referral_df), -1, dtype=np.int64)
+        referrer_codes[has_referrer] = self.node_index.get_indexer(referrer)
+        sent_codes = referrer_codes[has_referrer]
+        source = referrer_codes[converted]
+        target = self.node_index.get_indexer(referred)
+
+        # Deduplicated (source, target) pairs, sorted by source, become the CSR edges
+        edge_keys, edge_of_referral = np.unique(source * n_nodes + target, return_inverse=True)
+        edge_source = edge_keys // n_nodes
+        self.indices = edge_keys % n_nodes
+        self.edge_bonus = np.bincount(edge_of_referral, weights=bonus[converted], minlength=len(edge_keys))
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(edge_source, minlength=n_nodes))])
+
+        # Earliest converted referral per referred customer; only later conversions earn referral credit.
+        # Stored as int64 nanoseconds, int64 max for customers that were never referred
+        if 'referral_date' in referral_df.columns:
+            referral_dates = pd.to_datetime(referral_df['referral_date']).to_numpy(dtype='datetime64[ns]')
+            referral_dates = referral_dates.view('int64')[converted]
+        else:
+            referral_dates = np.full(len(target), np.iinfo(np.int64).min)
+        self.referred_since = np.full(n_nodes, np.iinfo(np.int64).max)
+        np.minimum.at(self.referred_since, target, referral_dates)
+
+        # Per-referrer totals over all referrals, converted or not
+        self.referrals_sent = np.bincount(sent_codes, minlength=n_nodes)
+        self.referrals_converted = np.bincount(source, minlength=n_nodes)
+        self.bonus_total = np.bincount(sent_codes, weights=bonus[has_referrer], minlength=n_nodes)
+        self.bonus_converted = np.bincount(source, weights=bonus[converted], minlength=n_nodes)
+
+        self.node_value = np.zeros(n_nodes)
+        if customer_value is not None:
+            codes = self._node_codes(customer_value.index, 'customer_value')
+            known = codes >= 0
+            self.node_value[codes[known]] = customer_value.to_numpy(dtype=np.float64)[known]
+
+    def _node_codes(self, customer_ids, name):
+        """
+        Dense node codes of customer ids, -1 for customers outside the graph
+
+        Raises a ValueError if there are ids but none of them is in the graph (e.g. string
+        ids against numeric ones), rather than silently treating every customer as unknown.
+        """
+        customer_ids = pd.Series(customer_ids)
+        codes = self.node_index.get_indexer(customer_ids)
+        if len(self.nodes) and customer_ids.notna().any() and not (codes >= 0).any():
+            raise ValueError(f"No {name} ids match a customer in the referral graph")
+        return codes
+
+    @property
+    def referred_customers(self):
+        """Customer ids that joined through a converted referral"""
+        return self.nodes[np.unique(self.indices)]
+
+    def _referred_conversions(self, attribution):
+        """Conversions made by a referred customer at or after their earliest converted referral"""
+        codes = self._node_codes(attribution.conversions['customer_id'], 'conversion customer')
+        # Code -1 (not in the graph) picks the appended "never referred" entry
+        since = np.append(self.referred_since, np.iinfo(np.int64).max)[codes]
+        times = attribution.conversions['timestamp'].to_numpy(dtype='datetime64[ns]').view('int64')
+        return times >= since
+
+    def _expand(self, node_codes):
+        """One vectorized hop: (position in node_codes, target code) for every out-edge of the given nodes"""
+        starts = self.indptr[node_codes]
+        counts = self.indptr[node_codes + 1] - starts
+        owner = np.repeat(np.arange(len(node_codes)), counts)
+        edge = np.arange(len(owner)) - np.repeat(np.cumsum(counts) - counts, counts) + starts[owner]
+        return owner, self.indices[edge]
+
+    def _traverse(self, roots, max_hops, max_pairs):
+        """
+        Level-by-level traversal from a group of roots
+
+        Returns the newly reached (root * n_nodes + node) keys of each hop, or None once more
+        than max_pairs pairs have been reached. Each level is a sorted array, and new keys are
+        checked against the earlier levels with searchsorted, so the visited set is never re-sorted.
+        """
+        n_nodes = len(self.nodes)
+        levels = [roots * n_nodes + roots]
+        frontier_root, frontier_node = roots, roots
+        n_reached = 0
+
+        while len(frontier_node) and (max_hops is None or len(levels) <= max_hops):
+            owner, targets = self._expand(frontier_node)
+            keys = np.unique(frontier_root[owner] * n_nodes + targets)
+            for level in levels:
+                if len(keys) and len(level):
+                    positions = np.minimum(np.searchsorted(level, keys), len(level) - 1)
+                    keys = keys[level[positions] != keys]
+            levels.append(keys)
+            n_reached += len(keys)
+            if max_pairs is not None and n_reached > max_pairs:
+                return None
+            frontier_root, frontier_node = keys // n_nodes, keys % n_nodes
+
+        return levels[1:]
+
+    def iter_chain_codes(self, root_codes=None, max_hops=None, chunk_roots=100_000, max_pairs=20_000_000):
+        """
+        Breadth-first multi-hop traversal from many roots at once, without recursion
+
+        Yields (root codes, reached codes, hop) arrays per group of roots; each customer is
+        reported once per root at its shortest hop, and cycles terminate because (root, node)
+        pairs already visited are dropped.
+
+        Memory is bounded by reached (root, customer) pairs rather than by root count: a group
+        of roots that reaches more than max_pairs pairs is split in half and retried. A single
+        root is always traversed in full, so its downstream component must fit in memory.
+        """
+        if root_codes is None:
+            root_codes = np.nonzero(np.diff(self.indptr) > 0)[0]
+        root_codes = np.unique(np.asarray(root_codes, dtype=np.int64))
+        n_nodes = len(self.nodes)
+
+        # Explicit stack of root groups, processed in root order
+        pending = [root_codes[start:start + chunk_roots] for start in range(0, len(root_codes), chunk_roots)][::-1]
+        while pending:
+            roots = pending.pop()
+            levels = self._traverse(roots, max_hops, max_pairs if len(roots) > 1 else None)
+            if levels is None:
+                half = len(roots) // 2
+                pending.extend([roots[half:], roots[:half]])
+                continue
+
+            keys = np.concatenate(levels + [np.empty(0, dtype=np.int64)])
+            if len(keys):
+                hops = np.repeat(np.arange(1, len(levels) + 1, dtype=np.int32), [len(level) for level in levels])
+                yield keys // n_nodes, keys % n_nodes, hops
+
+    def referral_chains(self, referrer_ids=None, max_hops=None):
+        """
+        Multi-hop referral chains as a DataFrame of (referrer_id, customer_id, hop)
+
+        Parameters:
+        referrer_ids: Optional list of referrers to start from (defaults to every referrer with a conversion)
+        max_hops: Optional limit on chain length
+        """
+        root_codes = None
+        if referrer_ids is not None:
+            root_codes = self._node_codes(list(referrer_ids), 'referrer')
+            root_codes = root_codes[root_codes >= 0]
+
+        frames = [
+            pd.DataFrame({'referrer_id': self.nodes[roots], 'customer_id': self.nodes[nodes], 'hop': hops})
+            for roots, nodes, hops in self.iter_chain_codes(root_codes, max_hops)
+        ]
+        if not frames:
+            return pd.DataFrame({'referrer_id': [], 'customer_id': [], 'hop': []})
+        return pd.concat(frames, ignore_index=True)
+
+    def referrer_summary(self, max_hops=None, hop_decay=1.0):
+        """
+        Per-referrer downstream conversion value and bonus ROI
+
+        Parameters:
+        max_hops: Optional limit on chain length
+        hop_decay: Multiplier applied per extra hop (1.0 credits the whole chain equally)
+
+        Returns:
+        DataFrame with one row per referrer
+        """
+        n_nodes = len(self.nodes)
+        direct_referred = np.diff(self.indptr)
+        direct_value = np.bincount(
+            np.repeat(np.arange(n_nodes), direct_referred), weights=self.node_value[self.indices], minlength=n_nodes
+        )
+
+        downstream_customers = np.zeros(n_nodes, dtype=np.int64)
+        downstream_value = np.zeros(n_nodes)
+        chain_depth = np.zeros(n_nodes, dtype=np.int32)
+        for roots, nodes, hops in self.iter_chain_codes(max_hops=max_hops):
+            downstream_customers += np.bincount(roots, minlength=n_nodes)
+            downstream_value += np.bincount(
+                roots, weights=self.node_value[nodes] * hop_decay ** (hops - 1), minlength=n_nodes
+            )
+            np.maximum.at(chain_depth, roots, hops)
+
+        summary = pd.DataFrame({
+            'referrer_id': self.nodes,
+            'referrals_sent': self.referrals_sent,
+            'referral_conversions': self.referrals_converted,
+            'referred_customers': direct_referred,
+            'bonus_total': self.bonus_total,
+            'bonus_converted': self.bonus_converted,
+            'direct_value': direct_value,
+            'downstream_customers': downstream_customers,
+            'downstream_value': downstream_value,
+            'chain_depth': chain_depth
+        })
+        summary = summary[summary['referrals_sent'] > 0].reset_index(drop=True)
+        bonus = summary['bonus_total'].to_numpy()
+        summary['bonus_roi'] = np.divide(
+            summary['downstream_value'].to_numpy() - bonus, bonus, out=np.full(len(bonus), np.nan), where=bonus > 0
+        )
+        return summary
+
+    def referral_channel_attribution(self, attribution, model='linear', referral_share=0.5, channel='Referral'):
+        """
+        Attribution results with referral credit added as its own channel
+
+        A referral_share of every conversion a referred customer makes on or after their first
+        converted referral moves from the channels that were credited to the referral channel
+        (earlier conversions keep their credit); referred conversions without any
+        touchpoint go to the referral channel in full. For the rule-based models this is
+        done per credited touch from the ledger; for the other models the channel totals
+        are scaled down by the referred share of conversion value.
+        """
+        referred = self._referred_conversions(attribution)
+        values = attribution.conversions['conversion_value'].to_numpy(dtype=np.float64)
+
+        if model not in RULE_BASED_MODELS:
+            if model == 'incremental':
+                raise ValueError("Incremental attribution needs a control group; pass its results to add_referral_channel")
+            return self.add_referral_channel(
+                getattr(attribution, f'{model}_attribution')(), attribution, referral_share, channel
+            )
+
+        index = attribution.build_journey_index()
+        channels = index['channels']
+        totals = np.zeros(len(channels))
+        touches = np.zeros(len(channels), dtype=np.int64)
+        referral_value = values[referred & (index['conv_count'] == 0)].sum()
+
+        for ledger in attribution.iter_credit_ledger(model, include_conversion_rows=True):
+            row_referred = referred[ledger.conversion_row]
+            kept = ledger.value * np.where(row_referred, 1 - referral_share, 1.0)
+            totals += np.bincount(ledger.channel, weights=kept, minlength=len(channels))
+            touches += np.bincount(ledger.channel, minlength=len(channels))
+            referral_value += (ledger.value - kept).sum()
+
+        credited = touches > 0
+        return pd.DataFrame({
+            'channel': np.append(np.asarray(channels)[credited], channel),
+            'value': np.append(totals[credited], referral_value)
+        })
+
+    def add_referral_channel(self, result_df, attribution, referral_share=0.5, channel='Referral'):
+        """Add a referral channel to channel-level results (e.g. algorithmic, probabilistic, incremental)"""
+        referred = self._referred_conversions(attribution)
+        values = attribution.conversions['conversion_value'].to_numpy(dtype=np.float64)
+        referred_fraction = values[referred].sum() / values.sum() if values.sum() else 0.0
+
+        result = result_df[['channel', 'value']].copy()
+        referral_value = result['value'].sum() * referral_share * referred_fraction
+        result['value'] = result['value'] * (1 - referral_share * referred_fraction)
+        return pd.concat([result, pd.DataFrame({'channel': [channel], 'value': [referral_value]})], ignore_index=True)
+
+
+if __name__ == '__main__':
+    # Analyze the referral graph in the sample data generated by marketing-data-generator.py
+    referral_df = pd.read_csv('sample_referral_data.csv')
+    purchase_df = pd.read_csv('sample_purchase_data.csv')
+    graph = ReferralGraph(referral_df, purchase_df.groupby('customer_id')['purchase_amount'].sum())
+
+    summary_df = graph.referrer_summary()
+    summary_df.to_csv('sample_referral_summary.csv', index=False)
+
+    print("\nReferral Graph Summary:")
+    print(f"Referrers: {len(summary_df)}, converted referral edges: {len(graph.indices)}")
+    print(f"Longest referral chain: {summary_df['chain_depth'].max()} hops")
+    print("\nTop Referrers by Downstream Value:")
+    print(summary_df.sort_values('downstream_value', ascending=False).head())
+
+    # Conversions in the attribution sample are keyed by the same customer ids (1-1000)
+    touchpoints_df, conversions_df, _ = attribution_module.generate_sample_data()
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+    print("\nLinear Attribution with Referral Channel:")
+    print(graph.referral_channel_attribution(attribution, 'linear'))
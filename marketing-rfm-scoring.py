@@ -80,31 +80,32 @@ def calculate_rfm_scores(purchase_df, analysis_date=None):
     
     return rfm
 
-# Generate all the previous datasets
-customer_df = generate_customer_data(1000)
-campaign_df = generate_campaign_data(50)
-engagement_df = generate_engagement_data(customer_df['customer_id'].tolist(), 5000)
-purchase_df = generate_purchase_data(customer_df['customer_id'].tolist(), 3000)
-referral_df = generate_referral_data(customer_df['customer_id'].tolist(), 1000)
-loyalty_df = generate_loyalty_data(customer_df['customer_id'].tolist())
+if __name__ == '__main__':
+    # Generate all the previous datasets
+    customer_df = generate_customer_data(1000)
+    campaign_df = generate_campaign_data(50)
+    engagement_df = generate_engagement_data(customer_df['customer_id'].tolist(), 5000)
+    purchase_df = generate_purchase_data(customer_df['customer_id'].tolist(), 3000)
+    referral_df = generate_referral_data(customer_df['customer_id'].tolist(), 1000)
+    loyalty_df = generate_loyalty_data(customer_df['customer_id'].tolist())
 
-# Calculate RFM scores
-rfm_df = calculate_rfm_scores(purchase_df)
+    # Calculate RFM scores
+    rfm_df = calculate_rfm_scores(purchase_df)
 
-# Save all datasets to CSV files
-customer_df.to_csv('sample_customer_data.csv', index=False)
-campaign_df.to_csv('sample_campaign_data.csv', index=False)
-engagement_df.to_csv('sample_engagement_data.csv', index=False)
-purchase_df.to_csv('sample_purchase_data.csv', index=False)
-referral_df.to_csv('sample_referral_data.csv', index=False)
-loyalty_df.to_csv('sample_loyalty_data.csv', index=False)
-rfm_df.to_csv('sample_rfm_data.csv', index=False)
+    # Save all datasets to CSV files
+    customer_df.to_csv('sample_customer_data.csv', index=False)
+    campaign_df.to_csv('sample_campaign_data.csv', index=False)
+    engagement_df.to_csv('sample_engagement_data.csv', index=False)
+    purchase_df.to_csv('sample_purchase_data.csv', index=False)
+    referral_df.to_csv('sample_referral_data.csv', index=False)
+    loyalty_df.to_csv('sample_loyalty_data.csv', index=False)
+    rfm_df.to_csv('sample_rfm_data.csv', index=False)
 
-# Print RFM analysis summary
-print("\nRFM Analysis Summary:")
-print("\nCustomer Segments Distribution:")
-print(rfm_df['customer_segment'].value_counts())
-print("\nRFM Score Statistics:")
-print(rfm_df['rfm_score'].describe())
-print("\nSample RFM Data:")
-print(rfm_df.head())
+    # Print RFM analysis summary
+    print("\nRFM Analysis Summary:")
+    print("\nCustomer Segments Distribution:")
+    print(rfm_df['customer_segment'].value_counts())
+    print("\nRFM Score Statistics:")
+    print(rfm_df['rfm_score'].describe())
+    print("\nSample RFM Data:")
+    print(rfm_df.head())
@@ -0,0 +1,313 @@
+import argparse
+import asyncio
+import json
+from datetime import datetime
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from script_loader import load_script
+
+attribution_module = load_script('marketing-attribution.py')
+MarketingAttribution = attribution_module.MarketingAttribution
+RULE_BASED_MODELS = attribution_module.RULE_BASED_MODELS
+calculate_rfm_scores = load_script('marketing-rfm-scoring.py').calculate_rfm_scores
+
+# Rule-based models are computed when a snapshot loads; the rest on first request
+LAZY_MODELS = ['algorithmic', 'probabilistic', 'incremental']
+
+
+class ScoringSnapshot:
+    def __init__(self, version, touchpoints_df, conversions_df, purchase_df, control_group_df=None):
+        """
+        Immutable set of loaded data and prebuilt indexes served by the scoring service
+
+        Parameters:
+        version: Snapshot counter, incremented on every reload
+        touchpoints_df / conversions_df: Inputs for MarketingAttribution
+        purchase_df: Purchase data for calculate_rfm_scores
+        control_group_df: Optional control group for incremental attribution
+        """
+        self.version = version
+        self.loaded_at = datetime.now()
+        self.control_group = control_group_df
+
+        self.attribution = MarketingAttribution(touchpoints_df, conversions_df)
+        self.attribution.build_journey_index()
+
+        self.channel_totals = {
+            model: getattr(self.attribution, f'{model}_attribution')().to_dict('records')
+            for model in RULE_BASED_MODELS
+        }
+        self._lazy_lock = asyncio.Lock()
+
+        rfm = calculate_rfm_scores(purchase_df.copy())
+        self.rfm = {record['customer_id']: record for record in rfm.to_dict('records')}
+
+    def compute_lazy_model(self, model):
+        """Run one of the expensive attribution models against this snapshot"""
+        if model == 'incremental':
+            if self.control_group is None:
+                raise ValueError("Incremental attribution requires a control group (--control)")
+            return self.attribution.incremental_attribution(self.control_group).to_dict('records')
+        return getattr(self.attribution, f'{model}_attribution')().to_dict('records')
+
+
+class SnapshotSource:
+    def __init__(self, touchpoints_path=None, conversions_path=None,
+                 purchases_path='sample_purchase_data.csv', control_path=None):
+        """
+        Where snapshots are loaded from. Without touchpoint/conversion files the
+        sample generator from marketing-attribution.py is used instead.
+        """
+        self.touchpoints_path = touchpoints_path
+        self.conversions_path = conversions_path
+        self.purchases_path = purchases_path
+        self.control_path = control_path
+
+    def load(self, version):
+        if self.touchpoints_path and self.conversions_path:
+            touchpoints_df = pd.read_csv(self.touchpoints_path)
+            conversions_df = pd.read_csv(self.conversions_path)
+            control_group_df = pd.read_csv(self.control_path) if self.control_path else None
+        else:
+            touchpoints_df, conversions_df, control_group_df = attribution_module.generate_sample_data()
+
+        purchase_df = pd.read_csv(self.purchases_path)
+        return ScoringSnapshot(version, touchpoints_df, conversions_df, purchase_df, control_group_df)
+
+
+class JourneyBatcher:
+    def __init__(self, service, max_batch=512, max_wait=0.002):
+        """
+        Coalesce concurrent journey lookups into one vectorized journey_credit call per model
+
+        Parameters:
+        max_batch: Maximum number of queued lookups resolved together
+        max_wait: Seconds to wait for more lookups after the first one arrives
+        """
+        self.service = service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.queue = asyncio.Queue()
+
+    async def submit(self, customer_id, model):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((customer_id, model, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+
+            # Every lookup in the batch is answered from the same snapshot
+            snapshot = self.service.snapshot
+            by_model = {}
+            for customer_id, model, future in batch:
+                by_model.setdefault(model, []).append((customer_id, future))
+
+            for model, lookups in by_model.items():
+                customer_ids = [customer_id for customer_id, _ in lookups]
+                try:
+                    credit = await loop.run_in_executor(
+                        None, snapshot.attribution.journey_credit, customer_ids, model
+                    )
+                except Exception as exc:
+                    for _, future in lookups:
+                        if not future.done():
+                            future.set_exception(exc)
+                    continue
+
+                journeys = {
+                    customer_id: frame.drop(columns='customer_id').to_dict('records')
+                    for customer_id, frame in credit.groupby('customer_id')
+                }
+                for customer_id, future in lookups:
+                    if not future.done():
+                        future.set_result((snapshot.version, journeys.get(customer_id, [])))
+
+
+def _json_default(value):
+    """Serialize numpy / pandas values that the json module does not understand"""
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (pd.Timestamp, datetime)):
+        return value.isoformat()
+    return str(value)
+
+
+def _parse_customer_id(raw):
+    try:
+        return int(raw)
+    except ValueError:
+        return raw
+
+
+class ScoringService:
+    STATUS_TEXT = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+    def __init__(self, source, host='127.0.0.1', port=8787):
+        """
+        Minimal asyncio HTTP service keeping attribution and RFM results warm in memory
+
+        Endpoints:
+        GET  /health                              Snapshot version and load time
+        GET  /journey/<customer_id>?model=linear  Per-touch credit for a customer's conversions
+        GET  /channels?model=linear               Per-channel totals for any attribution model
+        GET  /rfm/<customer_id>                   RFM scores and segment for a customer
+
+        Both customer lookups answer 404 for a customer the snapshot has no data for.
+        POST /reload                              Reload data and rebuild indexes into a new snapshot
+        """
+        self.source = source
+        self.host = host
+        self.port = port
+        self.snapshot = None
+        self.batcher = JourneyBatcher(self)
+        self._reload_lock = asyncio.Lock()
+        self._tasks = []
+
+    async def start(self):
+        loop = asyncio.get_running_loop()
+        self.snapshot = await loop.run_in_executor(None, self.source.load, 1)
+        self._tasks.append(asyncio.create_task(self.batcher.run()))
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+        for task in self._tasks:
+            task.cancel()
+
+    async def reload(self):
+        """Build a new snapshot off the event loop and swap it in atomically"""
+        async with self._reload_lock:
+            loop = asyncio.get_running_loop()
+            snapshot = await loop.run_in_executor(None, self.source.load, self.snapshot.version + 1)
+            self.snapshot = snapshot
+            return snapshot
+
+    async def channel_totals(self, model):
+        snapshot = self.snapshot
+        if model not in snapshot.channel_totals:
+            if model not in LAZY_MODELS:
+                raise ValueError(f"Unknown attribution model: {model}")
+            async with snapshot._lazy_lock:
+                if model not in snapshot.channel_totals:
+                    loop = asyncio.get_running_loop()
+                    snapshot.channel_totals[model] = await loop.run_in_executor(
+                        None, snapshot.compute_lazy_model, model
+                    )
+        return snapshot.version, snapshot.channel_totals[model]
+
+    async def dispatch(self, method, target):
+        url = urlsplit(target)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        model = query.get('model', 'linear')
+
+        if parts == ['reload']:
+            if method != 'POST':
+                return 405, {'error': 'Use POST to reload'}
+            snapshot = await self.reload()
+            return 200, {'snapshot': snapshot.version, 'loaded_at': snapshot.loaded_at}
+
+        if method != 'GET':
+            return 405, {'error': f'{method} not allowed'}
+
+        if parts == ['health']:
+            return 200, {'status': 'ok', 'snapshot': self.snapshot.version, 'loaded_at': self.snapshot.loaded_at}
+
+        if parts == ['channels']:
+            try:
+                version, totals = await self.channel_totals(model)
+            except ValueError as exc:
+                return 400, {'error': str(exc)}
+            return 200, {'model': model, 'snapshot': version, 'channels': totals}
+
+        if len(parts) == 2 and parts[0] == 'journey':
+            if model not in RULE_BASED_MODELS:
+                return 400, {'error': f"Journey credit supports: {', '.join(RULE_BASED_MODELS)}"}
+            customer_id = _parse_customer_id(parts[1])
+            if customer_id not in self.snapshot.attribution.build_journey_index()['customers']:
+                return 404, {'error': f'No touchpoints for customer {parts[1]}'}
+            version, touches = await self.batcher.submit(customer_id, model)
+            return 200, {'customer_id': customer_id, 'model': model, 'snapshot': version, 'touches': touches}
+
+        if len(parts) == 2 and parts[0] == 'rfm':
+            snapshot = self.snapshot
+            record = snapshot.rfm.get(_parse_customer_id(parts[1]))
+            if record is None:
+                return 404, {'error': f'No RFM scores for customer {parts[1]}'}
+            return 200, {'snapshot': snapshot.version, 'rfm': record}
+
+        return 404, {'error': f'No route for {url.path}'}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, version = request_line.decode('latin-1').split()
+
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                if int(headers.get('content-length', 0)):
+                    await reader.readexactly(int(headers['content-length']))
+
+                try:
+                    status, payload = await self.dispatch(method, target)
+                except Exception as exc:
+                    status, payload = 500, {'error': str(exc)}
+
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                body = json.dumps(payload, default=_json_default).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} {self.STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(body)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode() + body
+                )
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ValueError, ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(source, host, port):
+    service = await ScoringService(source, host, port).start()
+    print(f"Scoring service listening on http://{service.host}:{service.port} (snapshot {service.snapshot.version})")
+    async with service.server:
+        await service.server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Local HTTP scoring service for attribution and RFM lookups')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--touchpoints', help='CSV with customer_id, timestamp, channel, interaction_type')
+    parser.add_argument('--conversions', help='CSV with customer_id, timestamp, conversion_value')
+    parser.add_argument('--purchases', default='sample_purchase_data.csv', help='Purchase CSV used for RFM scoring')
+    parser.add_argument('--control', help='Optional control group CSV for incremental attribution')
+    args = parser.parse_args()
+
+    source = SnapshotSource(args.touchpoints, args.conversions, args.purchases, args.control)
+    asyncio.run(serve(source, args.host, args.port))
@@ -0,0 +1,20 @@
+import importlib.util
+import os
+import sys
+
+
+def load_script(filename):
+    """
+    Import one of the hyphenated marketing-*.py scripts as a module
+
+    The scripts only run their example code under __main__, so importing them just
+    defines their functions and classes. Each script is loaded once and cached.
+    """
+    module_name = filename[:-3].replace('-', '_')
+    if module_name not in sys.modules:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return sys.modules[module_name]
@@ -0,0 +1,221 @@
+import random
+
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+
+from script_loader import load_script
+
+attribution_module = load_script('marketing-attribution.py')
+MarketingAttribution = attribution_module.MarketingAttribution
+CreditLedger = attribution_module.CreditLedger
+RULE_BASED_MODELS = attribution_module.RULE_BASED_MODELS
+
+
+def direct_credit(touchpoints_df, conversions_df, model, half_life=7,
+                  position_weights={'first': 0.3, 'middle': 0.2, 'last': 0.5}):
+    """
+    Per-touch credit computed one conversion at a time, like the original iterrows implementations
+
+    Touches at the conversion timestamp count towards it; tied touches keep their table order.
+    """
+    touchpoints = touchpoints_df.assign(timestamp=pd.to_datetime(touchpoints_df['timestamp']))
+    rows = []
+    for position, conversion in conversions_df.reset_index(drop=True).iterrows():
+        conversion_time = pd.Timestamp(conversion['timestamp'])
+        customer_touches = touchpoints[
+            (touchpoints['customer_id'] == conversion['customer_id']) &
+            (touchpoints['timestamp'] <= conversion_time)
+        ].sort_values('timestamp', kind='stable')
+        if customer_touches.empty:
+            continue
+
+        n_touches = len(customer_touches)
+        if model == 'last_click':
+            weights = [0] * (n_touches - 1) + [1]
+        elif model == 'first_click':
+            weights = [1] + [0] * (n_touches - 1)
+        elif model == 'linear':
+            weights = [1 / n_touches] * n_touches
+        elif model == 'time_decay':
+            time_diffs = (conversion_time - customer_touches['timestamp']).dt.total_seconds() / (24 * 3600)
+            decay = np.exp(-np.log(2) * time_diffs.to_numpy() / half_life)
+            weights = list(decay / decay.sum())
+        else:
+            weights = []
+            for idx in range(n_touches):
+                if n_touches == 1:
+                    weights.append(1)
+                elif idx == 0:
+                    weights.append(position_weights['first'])
+                elif idx == n_touches - 1:
+                    weights.append(position_weights['last'])
+                else:
+                    weights.append(position_weights['middle'] / (n_touches - 2))
+
+        conversion_id = conversion['conversion_id'] if 'conversion_id' in conversions_df.columns else position
+        for idx, (weight, channel) in enumerate(zip(weights, customer_touches['channel'])):
+            if model in ('last_click', 'first_click') and weight == 0:
+                continue
+            rows.append({
+                'conversion_id': conversion_id,
+                'touch_index': idx,
+                'channel': channel,
+                'weight': weight,
+                'value': conversion['conversion_value'] * weight
+            })
+    return pd.DataFrame(rows, columns=['conversion_id', 'touch_index', 'channel', 'weight', 'value'])
+
+
+def direct_channel_totals(credit):
+    return credit.groupby('channel')['value'].sum().reset_index()
+
+
+def assert_channel_totals_equal(result, expected):
+    result = result.sort_values('channel').reset_index(drop=True)
+    expected = expected.sort_values('channel').reset_index(drop=True)
+    assert list(result['channel']) == list(expected['channel'])
+    np.testing.assert_allclose(result['value'].to_numpy(dtype=np.float64), expected['value'].to_numpy(dtype=np.float64))
+
+
+@pytest.fixture
+def journeys():
+    """Small journeys with timestamp ties, a touch at the conversion time and conversions without touches"""
+    touchpoints_df = pd.DataFrame([
+        (1, '2024-01-01 09:00', 'Email'),
+        (1, '2024-01-03 10:00', 'Display'),
+        (1, '2024-01-03 10:00', 'Social Media'),
+        (1, '2024-01-05 00:00', 'Paid Search'),
+        (1, '2024-01-07 12:00', 'Email'),
+        (2, '2024-01-02 08:00', 'Organic Search'),
+        (3, '2024-01-09 08:00', 'Display'),
+        (5, '2024-01-01 08:00', 'Email'),
+        (6, '2024-01-02 15:00', 'Display'),
+        (6, '2024-01-02 15:00', 'Email'),
+    ], columns=['customer_id', 'timestamp', 'channel'])
+    touchpoints_df['interaction_type'] = 'click'
+
+    # ORD-4 happens before customer 3's only touch and customer 4 has no touches at all
+    conversions_df = pd.DataFrame([
+        ('ORD-3', 2, '2024-01-04 00:00', 80.0),
+        ('ORD-1', 1, '2024-01-05 00:00', 100.0),
+        ('ORD-5', 4, '2024-01-06 00:00', 25.0),
+        ('ORD-2', 1, '2024-01-10 00:00', 40.0),
+        ('ORD-4', 3, '2024-01-08 00:00', 30.0),
+        ('ORD-6', 6, '2024-01-03 00:00', 60.0),
+    ], columns=['conversion_id', 'customer_id', 'timestamp', 'conversion_value'])
+    return touchpoints_df, conversions_df
+
+
+@pytest.fixture
+def sample_journeys():
+    random.seed(7)
+    touchpoints_df, conversions_df, _ = attribution_module.generate_sample_data(
+        n_customers=200, n_touchpoints=1000, n_conversions=100
+    )
+    return touchpoints_df, conversions_df
+
+
+def sorted_rows(frame):
+    return frame.sort_values(['conversion_id', 'touch_index']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('model', RULE_BASED_MODELS)
+def test_ledger_rows_match_direct_computation(journeys, model):
+    touchpoints_df, conversions_df = journeys
+    ledger = MarketingAttribution(touchpoints_df, conversions_df).credit_ledger(model).to_frame()
+    expected = direct_credit(touchpoints_df, conversions_df, model)
+
+    ledger = sorted_rows(ledger)
+    expected = sorted_rows(expected)
+    assert list(ledger['conversion_id']) == list(expected['conversion_id'])
+    assert list(ledger['touch_index']) == list(expected['touch_index'])
+    assert list(ledger['channel'].astype(str)) == list(expected['channel'])
+    np.testing.assert_allclose(ledger['weight'], expected['weight'])
+    np.testing.assert_allclose(ledger['value'], expected['value'])
+
+
+@pytest.mark.parametrize('model', RULE_BASED_MODELS)
+def test_channel_totals_match_model_output_and_direct_computation(journeys, model):
+    touchpoints_df, conversions_df = journeys
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+    expected = direct_channel_totals(direct_credit(touchpoints_df, conversions_df, model))
+
+    assert_channel_totals_equal(attribution.credit_ledger(model).channel_totals(), expected)
+    assert_channel_totals_equal(getattr(attribution, f'{model}_attribution')(), expected)
+
+
+@pytest.mark.parametrize('model', RULE_BASED_MODELS)
+def test_sample_data_totals_match_direct_computation(sample_journeys, model):
+    touchpoints_df, conversions_df = sample_journeys
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+    expected = direct_channel_totals(direct_credit(touchpoints_df, conversions_df, model))
+
+    assert_channel_totals_equal(getattr(attribution, f'{model}_attribution')(), expected)
+    chunks = list(attribution.iter_credit_ledger(model, chunk_rows=50))
+    assert len(chunks) > 1
+    assert_channel_totals_equal(CreditLedger.concat(chunks, chunks[0].channels).channel_totals(), expected)
+
+
+def test_conversions_without_touches_get_no_credit(journeys):
+    touchpoints_df, conversions_df = journeys
+    ledger = MarketingAttribution(touchpoints_df, conversions_df).credit_ledger('linear').to_frame()
+
+    assert set(ledger['conversion_id']) == {'ORD-1', 'ORD-2', 'ORD-3', 'ORD-6'}
+    np.testing.assert_allclose(ledger.groupby('conversion_id')['weight'].sum(), 1.0)
+
+
+def test_to_frame_decodes_string_conversion_ids(journeys):
+    touchpoints_df, conversions_df = journeys
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+    chunks = list(attribution.iter_credit_ledger('multi_touch', chunk_rows=1, include_conversion_rows=True))
+    frame = CreditLedger.concat(
+        chunks, chunks[0].channels, attribution.build_journey_index()['conversion_labels']
+    ).to_frame()
+
+    assert frame['conversion_id'].map(type).eq(str).all()
+    # Every decoded id is the conversion_id of the conversions row the ledger points at
+    assert list(frame['conversion_id']) == list(conversions_df['conversion_id'].to_numpy()[frame['conversion_row']])
+
+
+def test_integer_conversion_ids_are_kept():
+    touchpoints_df = pd.DataFrame({
+        'customer_id': [1, 1, 2], 'timestamp': ['2024-01-01', '2024-01-02', '2024-01-01'],
+        'channel': ['Email', 'Display', 'Email'], 'interaction_type': 'click'
+    })
+    conversions_df = pd.DataFrame({
+        'conversion_id': [9001, 42], 'customer_id': [2, 1],
+        'timestamp': ['2024-01-03', '2024-01-03'], 'conversion_value': [10.0, 20.0]
+    })
+    ledger = MarketingAttribution(touchpoints_df, conversions_df).credit_ledger('last_click')
+
+    assert ledger.conversion_labels is None
+    assert sorted(ledger.to_frame()['conversion_id']) == [42, 9001]
+
+
+def test_algorithmic_matches_direct_feature_matrix(sample_journeys):
+    touchpoints_df, conversions_df = sample_journeys
+    attribution = MarketingAttribution(touchpoints_df, conversions_df)
+
+    # Feature matrix built the way the original per-conversion implementation did
+    features = []
+    values = []
+    for _, conversion in attribution.conversions.iterrows():
+        customer_touches = attribution.touchpoints[
+            (attribution.touchpoints['customer_id'] == conversion['customer_id']) &
+            (attribution.touchpoints['timestamp'] <= conversion['timestamp'])
+        ]
+        if not customer_touches.empty:
+            channel_counts = customer_touches['channel'].value_counts()
+            channel_features = pd.Series(0, index=attribution.touchpoints['channel'].unique())
+            channel_features[channel_counts.index] = channel_counts
+            features.append(channel_features)
+            values.append(conversion['conversion_value'])
+
+    X = pd.DataFrame(features)
+    model = RandomForestRegressor(n_estimators=100, random_state=42)
+    model.fit(X, values)
+    expected = pd.DataFrame({'channel': X.columns, 'value': model.feature_importances_ * sum(values)})
+
+    assert_channel_totals_equal(attribution.algorithmic_attribution(), expected)
@@ -0,0 +1,163 @@
+import asyncio
+import json
+import random
+
+import pandas as pd
+import pytest
+
+from script_loader import load_script
+
+service_module = load_script('marketing-scoring-service.py')
+attribution_module = load_script('marketing-attribution.py')
+RULE_BASED_MODELS = attribution_module.RULE_BASED_MODELS
+UNKNOWN_CUSTOMER = 999999
+
+
+@pytest.fixture
+def data_paths(tmp_path):
+    """Generated touchpoints, conversions and control group plus purchases for customers 1-40, as CSV files"""
+    random.seed(11)
+    touchpoints_df, conversions_df, control_group_df = attribution_module.generate_sample_data(
+        n_customers=200, n_touchpoints=1000, n_conversions=60
+    )
+    purchase_df = pd.DataFrame([
+        {
+            'purchase_id': f'P-{customer_id}-{idx}',
+            'customer_id': customer_id,
+            'purchase_date': pd.Timestamp('2024-01-01') + pd.Timedelta(days=3 * customer_id + idx),
+            'purchase_amount': 10.0 * customer_id + idx
+        }
+        for customer_id in range(1, 41)
+        for idx in range(customer_id % 5 + 1)
+    ])
+
+    paths = {}
+    for name, frame in [('touchpoints', touchpoints_df), ('conversions', conversions_df),
+                        ('purchases', purchase_df), ('control', control_group_df)]:
+        paths[name] = str(tmp_path / f'{name}.csv')
+        frame.to_csv(paths[name], index=False)
+    return paths
+
+
+def make_source(paths, with_control=True):
+    return service_module.SnapshotSource(
+        paths['touchpoints'], paths['conversions'], paths['purchases'], paths['control'] if with_control else None
+    )
+
+
+async def request(port, method, path):
+    reader, writer = await asyncio.open_connection('127.0.0.1', port)
+    writer.write(f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nConnection: close\r\n\r\n".encode())
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b'\r\n\r\n')
+    return int(head.split()[1]), json.loads(body)
+
+
+def run_with_service(source, scenario):
+    """Start the service on a free port, run the scenario against it and shut it down"""
+    async def main():
+        service = await service_module.ScoringService(source, port=0).start()
+        try:
+            return await scenario(service)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+def test_concurrent_journey_lookups_are_batched(data_paths):
+    calls = []
+
+    async def scenario(service):
+        attribution = service.snapshot.attribution
+        journey_credit = attribution.journey_credit
+
+        def counting_journey_credit(customer_ids, model):
+            calls.append(list(customer_ids))
+            return journey_credit(customer_ids, model)
+
+        attribution.journey_credit = counting_journey_credit
+        # A wider batching window so the concurrent lookups reliably share batches
+        service.batcher.max_wait = 0.05
+        customer_ids = sorted(
+            set(attribution.conversions['customer_id']) & set(attribution.touchpoints['customer_id'])
+        )[:20]
+        responses = await asyncio.gather(*[
+            request(service.port, 'GET', f'/journey/{customer_id}?model=linear') for customer_id in customer_ids
+        ])
+        return customer_ids, responses, journey_credit(customer_ids, 'linear')
+
+    customer_ids, responses, expected = run_with_service(make_source(data_paths), scenario)
+
+    assert len(calls) < len(customer_ids)
+    assert sorted(customer_id for batch in calls for customer_id in batch) == customer_ids
+    for customer_id, (status, payload) in zip(customer_ids, responses):
+        assert status == 200
+        assert payload['customer_id'] == customer_id
+        assert payload['snapshot'] == 1
+        customer_credit = expected[expected['customer_id'] == customer_id]
+        assert len(payload['touches']) == len(customer_credit)
+        assert sum(touch['value'] for touch in payload['touches']) == pytest.approx(customer_credit['value'].sum())
+
+
+def test_channel_totals_for_precomputed_lazy_and_unknown_models(data_paths):
+    async def scenario(service):
+        results = {}
+        for model in RULE_BASED_MODELS + ['algorithmic', 'incremental', 'unknown']:
+            results[model] = await request(service.port, 'GET', f'/channels?model={model}')
+        return results, set(service.snapshot.channel_totals)
+
+    results, cached_models = run_with_service(make_source(data_paths), scenario)
+
+    for model in RULE_BASED_MODELS + ['algorithmic', 'incremental']:
+        status, payload = results[model]
+        assert status == 200
+        assert payload['model'] == model
+        assert payload['channels']
+    assert {'algorithmic', 'incremental'} <= cached_models
+    assert results['unknown'][0] == 400
+
+
+def test_incremental_without_control_group_is_a_bad_request(data_paths):
+    async def scenario(service):
+        return await request(service.port, 'GET', '/channels?model=incremental')
+
+    status, payload = run_with_service(make_source(data_paths, with_control=False), scenario)
+    assert status == 400
+    assert 'control group' in payload['error']
+
+
+def test_unknown_customers_are_not_found(data_paths):
+    async def scenario(service):
+        return [
+            await request(service.port, 'GET', '/rfm/1'),
+            await request(service.port, 'GET', f'/rfm/{UNKNOWN_CUSTOMER}'),
+            await request(service.port, 'GET', f'/journey/{UNKNOWN_CUSTOMER}'),
+            await request(service.port, 'GET', '/journey/1?model=algorithmic'),
+            await request(service.port, 'GET', '/nowhere')
+        ]
+
+    known_rfm, unknown_rfm, unknown_journey, lazy_journey, no_route = run_with_service(make_source(data_paths), scenario)
+    assert known_rfm[0] == 200
+    assert known_rfm[1]['rfm']['customer_id'] == 1
+    assert unknown_rfm[0] == 404
+    assert unknown_journey[0] == 404
+    assert lazy_journey[0] == 400
+    assert no_route[0] == 404
+
+
+def test_reload_requires_post_and_swaps_the_snapshot(data_paths):
+    async def scenario(service):
+        return [
+            await request(service.port, 'GET', '/reload'),
+            await request(service.port, 'POST', '/reload'),
+            await request(service.port, 'GET', '/health')
+        ]
+
+    get_reload, post_reload, health = run_with_service(make_source(data_paths), scenario)
+    assert get_reload[0] == 405
+    assert post_reload[0] == 200
+    assert post_reload[1]['snapshot'] == 2
+    assert health[0] == 200
+    assert health[1]['snapshot'] == 2